@@ -12,24 +12,41 @@ import subprocess
 import json
 import argparse
 import logging
+import multiprocessing
 import re
 from pathlib import Path
 import time
 import shutil
 import urllib.request
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 
 # --- Configuration ---
 VERSION = "1.2.1"
 GITHUB_REPO_URL = "https://api.github.com/repos/theovit/VolNorm/releases/latest"
 FFMPEG_PATH = shutil.which('ffmpeg')
 FFPROBE_PATH = shutil.which('ffprobe')
+UPDATE_CHECK_CACHE = Path.home() / '.cache' / 'volnorm' / 'update_check.json'
+UPDATE_CHECK_TTL = 24 * 60 * 60
 LOUDNESS_TARGETS = {
     "I": -24.0,
     "LRA": 13.0,
     "TP": -2.0
 }
 LOUDNESS_TOLERANCE = 0.5
-SUPPORTED_EXTENSIONS = ['.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm']
+# Derived from the targets above; loudnorm arguments are identical for every file
+LOUDNESS_I_MIN = LOUDNESS_TARGETS['I'] - LOUDNESS_TOLERANCE
+LOUDNESS_I_MAX = LOUDNESS_TARGETS['I'] + LOUDNESS_TOLERANCE
+LOUDNORM_FILTER = f"loudnorm=I={LOUDNESS_TARGETS['I']}:LRA={LOUDNESS_TARGETS['LRA']}:tp={LOUDNESS_TARGETS['TP']}"
+LOUDNORM_ANALYSIS_FILTER = f"{LOUDNORM_FILTER}:print_format=json"
+HDD_MAX_JOBS = 2
+WINDOWS_MAX_JOBS = 61
+STAMP_XATTR = 'user.volnorm.stamp'
+STAMP_SIDECAR_SUFFIX = '.volnorm'
+SUPPORTED_EXTENSIONS = frozenset({'.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm'})
 FORMAT_MAP = {
     '.mkv': 'matroska',
     '.mp4': 'mp4',
@@ -39,17 +56,59 @@ FORMAT_MAP = {
     '.flv': 'flv',
     '.webm': 'webm'
 }
+FFMPEG_STDERR_TAIL_LINES = 128
+DURATION_PATTERN = re.compile(r'Duration:\s*(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+DURATION_HEADER_RESOLUTION = 0.01
+# e.g. "Stream #0:1(eng): Audio: aac (LC) (mp4a / 0x6134706D), 48000 Hz, stereo, fltp, 192 kb/s"
+AUDIO_STREAM_PATTERN = re.compile(r'Stream #\d+:\d+\S*: Audio: (\w+)[^,\n]*, (\d+) Hz, [^,\n]+, (\w+)')
+# Anchored on a loudnorm field so stray braces elsewhere in FFmpeg's output are never picked up
+LOUDNORM_JSON_PATTERN = re.compile(r'\{[^{}]*"input_i"\s*:\s*"[^"]*"[^{}]*\}')
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 LOG_FILE = Path(__file__).parent / 'leveler.log'
 
+# Set in each pool worker by init_worker
+_worker_stop_event = None
+
 # --- Setup Logging ---
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, handlers=[
     logging.FileHandler(LOG_FILE, encoding='utf-8'),
     logging.StreamHandler(sys.stdout)
 ])
 
-def check_for_updates():
-    """Checks for a new version and attempts to auto-update if in a git repo."""
+def read_update_cache():
+    """Returns the cached result of the last update check, or None if it is missing or older than UPDATE_CHECK_TTL."""
+    try:
+        with open(UPDATE_CHECK_CACHE, encoding='utf-8') as f:
+            cached = json.load(f)
+        if time.time() - cached['ts'] < UPDATE_CHECK_TTL:
+            return cached
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def write_update_cache(latest_version=None):
+    """Records a successful update check so repeated runs can skip the network round-trip."""
+    try:
+        UPDATE_CHECK_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(UPDATE_CHECK_CACHE, 'w', encoding='utf-8') as f:
+            json.dump({'ts': time.time(), 'tag': latest_version}, f)
+    except OSError as e:
+        logging.warning(f"Could not write update check cache: {e}")
+
+def check_for_updates(force=False):
+    """Checks for a new version and attempts to auto-update if in a git repo.
+
+    Unless force is set, the check is skipped if one already succeeded within UPDATE_CHECK_TTL.
+    """
+    if not force:
+        cached = read_update_cache()
+        if cached is not None:
+            if cached.get('tag') and cached['tag'] > VERSION:
+                logging.warning(f"A new version ({cached['tag']}) is available. Please update your script by running 'git pull'.")
+            else:
+                logging.info("Skipping update check: already checked within the last 24 hours.")
+            return
+
     logging.info("Checking for updates...")
     
     script_dir = Path(__file__).parent
@@ -57,18 +116,15 @@ def check_for_updates():
 
     if git_dir.is_dir():
         try:
-            # Check if git is installed
-            subprocess.run(['git', '--version'], capture_output=True, check=True)
-            
             logging.info("Git repository detected. Attempting to auto-update...")
             
-            # Fetch latest changes from remote
+            # Fetch latest changes from remote (raises FileNotFoundError if git is not installed)
             subprocess.run(['git', 'fetch'], cwd=script_dir, capture_output=True, check=True)
             
-            # Check if local is behind remote
-            status_result = subprocess.run(['git', 'status', '-uno'], cwd=script_dir, capture_output=True, text=True, check=True)
+            # Count the upstream commits missing locally
+            behind_result = subprocess.run(['git', 'rev-list', '--count', 'HEAD..@{u}'], cwd=script_dir, capture_output=True, text=True, check=True)
             
-            if "Your branch is behind" in status_result.stdout:
+            if int(behind_result.stdout.strip() or 0) > 0:
                 logging.warning("A new version is available. Pulling changes from remote...")
                 pull_result = subprocess.run(['git', 'pull'], cwd=script_dir, capture_output=True, text=True, check=True)
                 logging.info("Update successful. Please restart the script.")
@@ -76,6 +132,7 @@ def check_for_updates():
                 sys.exit(0)
             else:
                 logging.info("You are running the latest version.")
+                write_update_cache()
                 
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
             logging.warning("Git command failed or git is not installed. Falling back to GitHub release check.")
@@ -97,6 +154,7 @@ def check_for_updates_fallback():
                 logging.warning(f"A new version ({latest_version}) is available. Please update your script by running 'git pull'.")
             else:
                 logging.info("You are running the latest version.")
+            write_update_cache(latest_version)
     except urllib.error.HTTPError as e:
         if e.code == 404:
             logging.error(f"Could not check for updates: The configured GitHub repository URL was not found (404). Please verify the URL in 'audio_leveler.py'.")
@@ -108,24 +166,71 @@ def check_for_updates_fallback():
 def get_media_files(directory):
     """Recursively finds all supported media files in a directory."""
     files = []
-    for p in Path(directory).rglob('*'):
-        if p.suffix.lower() in SUPPORTED_EXTENSIONS:
-            files.append(p)
+    pending = [os.fspath(directory)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS and entry.is_file():
+                        files.append(entry.path)
+        except OSError as e:
+            logging.warning(f"Could not scan directory: {e}")
     return files
 
 def get_stream_info(file_path):
-    """Uses ffprobe to get media file stream information."""
+    """Uses ffprobe to get media file stream information. Results are cached per resolved path."""
+    return _probe_stream_info(str(Path(file_path).resolve()))
+
+@lru_cache(maxsize=512)
+def _probe_stream_info(file_path):
+    """Runs ffprobe on a file. Call _probe_stream_info.cache_clear() after a file is modified."""
     command = [
         FFPROBE_PATH,
         '-v', 'quiet',
         '-print_format', 'json',
         '-show_format',
         '-show_streams',
-        str(file_path)
+        file_path
     ]
     result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
     return json.loads(result.stdout)
 
+def run_ffmpeg(command):
+    """Runs an FFmpeg command, streaming its stderr instead of buffering all of it.
+
+    Only the header (everything up to 'Stream mapping:', which holds the input duration) and the
+    last FFMPEG_STDERR_TAIL_LINES lines (which hold the loudnorm JSON and any error) are kept.
+    """
+    header = []
+    tail = deque(maxlen=FFMPEG_STDERR_TAIL_LINES)
+    # Parallel runs must not share the terminal: each ffmpeg would put it in raw mode and fight over keypresses
+    with subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, encoding='utf-8', errors='replace') as proc:
+        for line in proc.stderr:
+            if tail or line.startswith('Stream mapping:'):
+                tail.append(line)
+            else:
+                header.append(line)
+        returncode = proc.wait()
+    return subprocess.CompletedProcess(command, returncode, stderr=''.join(header) + ''.join(tail))
+
+def parse_input_duration(stderr_output):
+    """Parses the input duration in seconds from FFmpeg's 'Duration: HH:MM:SS.ss' header, or None if absent."""
+    match = DURATION_PATTERN.search(stderr_output)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+def parse_audio_properties(stderr_output):
+    """Parses (codec, sample_fmt, sample_rate) of the first input audio stream from FFmpeg's header, or None if absent."""
+    match = AUDIO_STREAM_PATTERN.search(stderr_output)
+    if not match:
+        return None
+    codec, sample_rate, sample_fmt = match.groups()
+    return codec, sample_fmt, sample_rate
+
 def format_loudness_info(i, lra, tp, source):
     """Formats loudness information for logging."""
     return f"{source} Loudness:\n" \
@@ -133,61 +238,142 @@ def format_loudness_info(i, lra, tp, source):
            f"  Loudness Range (LRA):    {lra:.2f} LU\n" \
            f"  True Peak (TP):          {tp:.2f} dBTP"
 
-def process_file(file_path):
-    """Processes a single media file for audio normalization."""
+def drop_page_cache(file_path):
+    """Tells the kernel a file's cached pages won't be reused. A no-op where posix_fadvise is unavailable."""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def read_stamp(file_path):
+    """Returns the stamp dict left on a file by a previous run, or None if there is none."""
+    try:
+        return json.loads(os.getxattr(file_path, STAMP_XATTR))
+    except (AttributeError, OSError, ValueError):
+        # No xattr support (non-Linux, some network shares) or no stamp: look for a sidecar instead
+        pass
+    try:
+        with open(f"{file_path}{STAMP_SIDECAR_SUFFIX}", encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def make_stamp(file_path, mode):
+    """Builds the stamp for a file normalized in the given loudnorm mode ('linear' or 'dynamic') to the current targets."""
+    return {'version': VERSION, 'mode': mode, 'filter': LOUDNORM_FILTER, 'mtime': int(os.stat(file_path).st_mtime)}
+
+def write_stamp(file_path, mode):
+    """Marks a file as normalized, as an xattr where supported, otherwise as a sidecar file."""
+    stamp = json.dumps(make_stamp(file_path, mode))
+    try:
+        os.setxattr(file_path, STAMP_XATTR, stamp.encode())
+        return
+    except (AttributeError, OSError):
+        pass
+    try:
+        with open(f"{file_path}{STAMP_SIDECAR_SUFFIX}", 'w', encoding='utf-8') as f:
+            f.write(stamp)
+    except OSError as e:
+        logging.warning(f"Could not mark '{file_path}' as normalized: {e}")
+
+def is_stamped(file_path, one_pass=False):
+    """Checks whether a file was normalized by this version to the current targets and has not been modified since.
+
+    Only linear (two-pass) results count, unless one_pass is set, in which case dynamic results are accepted too.
+    """
+    stamp = read_stamp(file_path)
+    if not isinstance(stamp, dict):
+        return False
+    try:
+        modes = ('linear', 'dynamic') if one_pass else ('linear',)
+        return any(stamp == make_stamp(file_path, mode) for mode in modes)
+    except OSError:
+        return False
+
+def process_file(file_path, one_pass=False, threads=None, force=False):
+    """Processes a single media file for audio normalization.
+
+    When one_pass is set, the analysis pass is skipped and loudnorm runs in dynamic mode.
+    When threads is set, each FFmpeg run is limited to that many decoder threads.
+    Files already stamped as normalized by this version are skipped unless force is set.
+    """
     file_path = Path(file_path)
+    # A leftover temp file from an interrupted run is overwritten by Pass 2 ('-y') and removed in the finally block
     tmp_path = file_path.with_suffix(file_path.suffix + '.tmp')
-    
-    if tmp_path.exists():
-        logging.warning(f"Orphaned temp file found: {tmp_path}. Deleting.")
-        os.remove(tmp_path)
 
     try:
-        # --- Pass 1: Analyze Loudness ---
-        logging.info(f"Pass 1: Analyzing '{file_path.name}'")
+        if not force and is_stamped(file_path, one_pass):
+            logging.info(f"SKIP: '{file_path.name}' was already normalized and has not changed since.")
+            return "skipped", 0
+
         start_time = time.time()
+        # loudnorm is serial per stream, so extra threads only help the decoder
+        thread_args = ['-threads', str(threads), '-filter_threads', '1'] if threads else []
+        loudnorm_filter = LOUDNORM_FILTER
+        audio_properties = None
+
+        if one_pass:
+            # Dynamic mode: loudnorm adjusts gain on the fly, so no analysis pass (and no efficiency gate) is needed.
+            logging.info(f"One-pass mode: skipping analysis for '{file_path.name}'")
+        else:
+            # --- Pass 1: Analyze Loudness ---
+            logging.info(f"Pass 1: Analyzing '{file_path.name}'")
+            
+            ffmpeg_cmd_pass1 = [
+                FFMPEG_PATH, '-hide_banner', '-nostats', *thread_args, '-i', str(file_path),
+                '-vn', '-sn', '-dn', '-map', '0:a',
+                '-af', LOUDNORM_ANALYSIS_FILTER,
+                '-f', 'null', '-'
+            ]
         
-        ffmpeg_cmd_pass1 = [
-            FFMPEG_PATH, '-hide_banner', '-i', str(file_path),
-            '-vn', '-sn', '-dn', '-map', '0:a',
-            '-af', f"loudnorm=I={LOUDNESS_TARGETS['I']}:LRA={LOUDNESS_TARGETS['LRA']}:tp={LOUDNESS_TARGETS['TP']}:print_format=json",
-            '-f', 'null', '-'
-        ]
-        
-        result_pass1 = subprocess.run(ffmpeg_cmd_pass1, capture_output=True, text=True, encoding='utf-8')
+            result_pass1 = run_ffmpeg(ffmpeg_cmd_pass1)
         
-        if result_pass1.returncode != 0:
-            logging.error(f"FFmpeg Pass 1 failed for {file_path.name}. Error:\n{result_pass1.stderr}")
-            return "failed", 0
+            if result_pass1.returncode != 0:
+                logging.error(f"FFmpeg Pass 1 failed for {file_path.name}. Error:\n{result_pass1.stderr}")
+                return "failed", 0
 
-        # Extract measured values from stderr
-        stderr_output = result_pass1.stderr
-        json_start_index = stderr_output.rfind('{')
-        json_end_index = stderr_output.rfind('}')
+            # Extract measured values from stderr
+            stderr_output = result_pass1.stderr
+            audio_properties = parse_audio_properties(stderr_output)
+            json_blocks = LOUDNORM_JSON_PATTERN.findall(stderr_output)
         
-        if json_start_index == -1 or json_end_index == -1:
-            logging.error(f"Could not find JSON stats in FFmpeg output for {file_path.name}. Full output:\n{stderr_output}")
-            return "failed", 0
+            if not json_blocks:
+                logging.error(f"Could not find JSON stats in FFmpeg output for {file_path.name}. Full output:\n{stderr_output}")
+                return "failed", 0
 
-        measured_stats_str = stderr_output[json_start_index:json_end_index+1]
+            measured_stats_str = json_blocks[-1]
         
-        try:
-            measured = json.loads(measured_stats_str)
-        except json.JSONDecodeError:
-            logging.error(f"Failed to parse JSON from FFmpeg output for {file_path.name}. String was:\n{measured_stats_str}")
-            return "failed", 0
+            try:
+                measured = json.loads(measured_stats_str)
+            except json.JSONDecodeError:
+                logging.error(f"Failed to parse JSON from FFmpeg output for {file_path.name}. String was:\n{measured_stats_str}")
+                return "failed", 0
         
-        input_i = float(measured['input_i'])
-        input_lra = float(measured['input_lra'])
-        input_tp = float(measured['input_tp'])
+            # Numeric copies are only for the log and the efficiency gate; Pass 2 gets loudnorm's own strings
+            input_i = float(measured['input_i'])
+            input_lra = float(measured['input_lra'])
+            input_tp = float(measured['input_tp'])
 
-        logging.info(format_loudness_info(input_i, input_lra, input_tp, "BEFORE"))
+            logging.info(format_loudness_info(input_i, input_lra, input_tp, "BEFORE"))
 
-        # --- Efficiency Gate ---
-        if (LOUDNESS_TARGETS['I'] - LOUDNESS_TOLERANCE) <= input_i <= (LOUDNESS_TARGETS['I'] + LOUDNESS_TOLERANCE) and input_lra <= LOUDNESS_TARGETS['LRA']:
-            time_saved = time.time() - start_time
-            logging.info(f"SKIP: '{file_path.name}' is already within loudness targets. Time saved: {time_saved:.2f}s")
-            return "skipped", time_saved
+            # --- Efficiency Gate ---
+            if LOUDNESS_I_MIN <= input_i <= LOUDNESS_I_MAX and input_lra <= LOUDNESS_TARGETS['LRA']:
+                time_saved = time.time() - start_time
+                logging.info(f"SKIP: '{file_path.name}' is already within loudness targets. Time saved: {time_saved:.2f}s")
+                write_stamp(file_path, 'linear')
+                drop_page_cache(file_path)
+                return "skipped", time_saved
+
+            # Linear mode: feed the measured values back into loudnorm verbatim, at the precision it reported them.
+            loudnorm_filter += f":measured_I={measured['input_i']}:measured_LRA={measured['input_lra']}:measured_tp={measured['input_tp']}:measured_thresh={measured['input_thresh']}:offset={measured['target_offset']}"
 
         # --- Pass 2: Apply Normalization ---
         logging.info(f"Pass 2: Normalizing '{file_path.name}'")
@@ -198,45 +384,71 @@ def process_file(file_path):
             return "failed", 0
 
         # Preserve the original audio codec, sample format and sample rate
-        try:
-            stream_info = get_stream_info(file_path)
-            audio_streams = [s for s in stream_info['streams'] if s['codec_type'] == 'audio']
-            original_audio_codec = audio_streams[0]['codec_name'] if audio_streams else None
-            original_sample_fmt = audio_streams[0]['sample_fmt'] if audio_streams else None
-            original_sample_rate = audio_streams[0]['sample_rate'] if audio_streams else None
-            if not original_audio_codec or not original_sample_fmt or not original_sample_rate:
-                logging.error(f"Could not determine original audio properties for {file_path.name}")
+        if audio_properties:
+            original_audio_codec, original_sample_fmt, original_sample_rate = audio_properties
+        else:
+            try:
+                stream_info = get_stream_info(file_path)
+                audio_streams = [s for s in stream_info['streams'] if s['codec_type'] == 'audio']
+                original_audio_codec = audio_streams[0]['codec_name'] if audio_streams else None
+                original_sample_fmt = audio_streams[0]['sample_fmt'] if audio_streams else None
+                original_sample_rate = audio_streams[0]['sample_rate'] if audio_streams else None
+                if not original_audio_codec or not original_sample_fmt or not original_sample_rate:
+                    logging.error(f"Could not determine original audio properties for {file_path.name}")
+                    return "failed", 0
+            except Exception as e:
+                logging.error(f"Could not get stream info for {file_path.name}: {e}")
                 return "failed", 0
-        except Exception as e:
-            logging.error(f"Could not get stream info for {file_path.name}: {e}")
-            return "failed", 0
             
+        # Dynamic mode pads its final 100ms frame, so trim the output back to the source duration
+        duration_limit = ['-t', get_stream_info(file_path)['format']['duration']] if one_pass else []
+
         ffmpeg_cmd_pass2 = [
-            FFMPEG_PATH, '-y', '-hide_banner', '-i', str(file_path),
+            FFMPEG_PATH, '-y', '-hide_banner', '-nostats', *thread_args, '-i', str(file_path),
             '-map', '0:v', '-map', '0:a', '-c:v', 'copy', '-c:a', original_audio_codec, '-sample_fmt', original_sample_fmt, '-ar', original_sample_rate,
-            '-af', f"loudnorm=I={LOUDNESS_TARGETS['I']}:LRA={LOUDNESS_TARGETS['LRA']}:tp={LOUDNESS_TARGETS['TP']}:measured_I={measured['input_i']}:measured_LRA={measured['input_lra']}:measured_tp={measured['input_tp']}:measured_thresh={measured['input_thresh']}:offset={measured['target_offset']}",
+            '-af', loudnorm_filter,
+            *duration_limit,
             '-strict', '-2',
             '-f', output_format,
             str(tmp_path)
         ]
         
-        result_pass2 = subprocess.run(ffmpeg_cmd_pass2, capture_output=True, text=True, encoding='utf-8')
+        result_pass2 = run_ffmpeg(ffmpeg_cmd_pass2)
         
         if result_pass2.returncode != 0:
             logging.error(f"FFmpeg Pass 2 failed for {file_path.name}. Error:\n{result_pass2.stderr}")
             return "failed", 0
+
+        # Both passes are done with the original, so don't let it crowd other data out of the page cache
+        drop_page_cache(file_path)
             
         # --- Verification ---
-        original_duration = float(get_stream_info(file_path)['format']['duration'])
+        # ffmpeg already reported the input duration when it opened the file; only the output needs probing
+        duration_tolerance = 0.1 # 100ms tolerance
+        original_duration = parse_input_duration(result_pass2.stderr)
+        if original_duration is None:
+            original_duration = float(get_stream_info(file_path)['format']['duration'])
+        else:
+            # The header truncates to centiseconds, so allow for that on top of the usual tolerance
+            duration_tolerance += DURATION_HEADER_RESOLUTION
         new_duration = float(get_stream_info(tmp_path)['format']['duration'])
 
-        if abs(original_duration - new_duration) > 0.1: # 100ms tolerance
+        if abs(original_duration - new_duration) > duration_tolerance:
             logging.error(f"VERIFICATION FAILED: Duration mismatch for '{file_path.name}'. Original: {original_duration}s, New: {new_duration}s")
             return "failed", 0
         
         # --- Atomic Swap ---
         logging.info(f"Verification successful. Replacing original file for '{file_path.name}'")
+        # Flush the new data to disk first so a crash can't leave the original replaced by an empty file
+        fd = os.open(tmp_path, os.O_RDWR)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        drop_page_cache(tmp_path)
         os.replace(tmp_path, file_path)
+        _probe_stream_info.cache_clear()
+        write_stamp(file_path, 'dynamic' if one_pass else 'linear')
 
         logging.info(format_loudness_info(LOUDNESS_TARGETS['I'], LOUDNESS_TARGETS['LRA'], LOUDNESS_TARGETS['TP'], "AFTER"))
         
@@ -252,6 +464,81 @@ def process_file(file_path):
         if tmp_path.exists():
             os.remove(tmp_path)
 
+def is_rotational(path):
+    """Checks whether a path lives on a spinning disk. Linux only; returns False when it can't be determined."""
+    try:
+        dev = os.stat(path).st_dev
+        block_dir = Path(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}").resolve()
+        # Partitions have no queue/ of their own; it lives on the parent disk
+        for candidate in (block_dir, block_dir.parent):
+            rotational = candidate / 'queue' / 'rotational'
+            if rotational.is_file():
+                return rotational.read_text().strip() == '1'
+    except (AttributeError, OSError):
+        pass
+    return False
+
+def init_worker(log_queue, stop_event):
+    """Routes a worker process's log records to the parent's QueueListener and shares the batch stop flag."""
+    global _worker_stop_event
+    _worker_stop_event = stop_event
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+
+def process_file_in_worker(file_path, one_pass, threads, force):
+    """Runs process_file in a pool worker, refusing to start once the batch has been interrupted."""
+    # Calls already handed to a worker can't be cancelled, so they check the flag themselves
+    if _worker_stop_event.is_set():
+        return "failed", 0
+    try:
+        return process_file(file_path, one_pass, threads, force)
+    except KeyboardInterrupt:
+        _worker_stop_event.set()
+        raise
+
+def process_files(files, jobs, one_pass=False, force=False):
+    """Processes files across a pool of worker processes, yielding (status, duration) as each completes."""
+    if jobs == 1:
+        for f in files:
+            yield process_file(f, one_pass, force=force)
+        return
+
+    if sys.platform == 'win32' and jobs > WINDOWS_MAX_JOBS:
+        logging.info(f"Windows supports at most {WINDOWS_MAX_JOBS} worker processes; limiting to {WINDOWS_MAX_JOBS} parallel jobs.")
+        jobs = WINDOWS_MAX_JOBS
+
+    # Split the cores between the parallel FFmpeg runs instead of letting each one claim them all
+    threads = max(1, (os.cpu_count() or 1) // jobs)
+
+    # Workers only enqueue records; a single listener thread here owns the file and console handlers
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue = multiprocessing.Queue(-1)
+    stop_event = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(log_queue, stop_event))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    try:
+        futures = {executor.submit(process_file_in_worker, f, one_pass, threads, force): f for f in files}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool as e:
+                logging.error(f"Worker process died while processing {futures[future]}: {e}")
+                yield "failed", 0
+    except BaseException:
+        # Ctrl-C (or any other abort) must stop the batch, not just the files currently in flight
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    else:
+        executor.shutdown(wait=True)
+    finally:
+        listener.stop()
+        root.handlers = handlers
+
 def cleanup_directory(directory):
     """Scans for and removes orphaned .tmp or .normalized files."""
     logging.info(f"Scanning '{directory}' for orphaned files...")
@@ -279,16 +566,25 @@ def main():
     parser.add_argument('--file', dest='single_file', type=str, help='Process a single media file.')
     parser.add_argument('--batch', dest='batch_dir', type=str, help='Run in batch mode on a directory.')
     parser.add_argument('--cleanup', action='store_true', help='Scan for and remove orphaned temporary files.')
-    parser.add_argument('--no-update-check', action='store_true', help='Skip the GitHub update check.')
+    parser.add_argument('--jobs', type=int, default=None, help=f'Number of files to process in parallel in batch mode (default: CPU count, or {HDD_MAX_JOBS} when the directory is on a spinning disk).')
+    parser.add_argument('--one-pass', action='store_true', help="Skip the analysis pass and normalize in loudnorm's dynamic mode. Roughly twice as fast, but less accurate than the default two-pass linear mode and never skips files already within targets.")
+    parser.add_argument('--force', action='store_true', help='Re-analyze files even if a previous run already normalized them.')
+    parser.add_argument('--update-check', dest='update_check', action='store_true', help='Check GitHub for a new version before processing.')
+    parser.add_argument('--no-update-check', dest='update_check', action='store_false', help='Skip the GitHub update check (the default; kept for compatibility).')
     parser.add_argument('--update', action='store_true', help='Check for updates and exit.')
     
     args = parser.parse_args()
 
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1.")
+
     if args.update:
-        check_for_updates()
+        check_for_updates(force=True)
         sys.exit(0)
 
-    if not args.no_update_check:
+    # Sonarr/Radarr fire once per imported file, so never spend a network round-trip there
+    arr_mode = bool(os.environ.get('sonarr_episodefile_path') or os.environ.get('radarr_moviefile_path'))
+    if args.update_check and not arr_mode:
         check_for_updates()
         
     file_to_process = None
@@ -311,21 +607,35 @@ def main():
         files = get_media_files(args.batch_dir)
         logging.info(f"Found {len(files)} media files to process.")
         
-        summary = {"processed": 0, "skipped": 0, "failed": 0, "time_saved": 0, "total_time": 0}
+        summary = Counter()
+        time_saved = 0.0
+        total_time = 0.0
         
-        for f in files:
-            status, duration = process_file(f)
+        jobs = args.jobs
+        if jobs is None:
+            # Parallel reads on a spinning disk just thrash the head, so only go wide on SSD/NVMe
+            if is_rotational(args.batch_dir):
+                jobs = HDD_MAX_JOBS
+                logging.info(f"'{args.batch_dir}' is on a rotational disk; limiting to {jobs} parallel jobs (override with --jobs).")
+            else:
+                jobs = os.cpu_count() or 1
+        logging.info(f"Processing with {jobs} parallel job(s).")
+        
+        batch_start = time.time()
+        for done, (status, duration) in enumerate(process_files(files, jobs, args.one_pass, args.force), 1):
             summary[status] += 1
             if status == 'skipped':
-                summary['time_saved'] += duration
-            summary['total_time'] += duration
+                time_saved += duration
+            total_time += duration
+            eta = (time.time() - batch_start) / done * (len(files) - done)
+            logging.info(f"Progress: {done}/{len(files)} files done, ETA {eta:.0f}s")
         
         logging.info("--- Batch Processing Summary ---")
         logging.info(f"Files Processed: {summary['processed']}")
         logging.info(f"Files Skipped: {summary['skipped']}")
         logging.info(f"Files Failed: {summary['failed']}")
-        logging.info(f"Total Time Saved by Skipping: {summary['time_saved']:.2f}s")
-        logging.info(f"Total Processing Time: {summary['total_time']:.2f}s")
+        logging.info(f"Total Time Saved by Skipping: {time_saved:.2f}s")
+        logging.info(f"Total Processing Time: {total_time:.2f}s")
         sys.exit(0) # Exit after batch processing
         
     elif args.cleanup:
@@ -338,7 +648,7 @@ def main():
         sys.exit(1)
 
     if file_to_process:
-        process_file(file_to_process)
+        process_file(file_to_process, args.one_pass, force=args.force)
 
 if __name__ == "__main__":
     main()
@@ -62,7 +62,11 @@ echo.
 echo   --file ^<file^>             Process a single media file.
 echo   --batch ^<directory^>       Run in batch mode on a directory.
 echo   --cleanup                  Scan for and remove orphaned temporary files.
-echo   --no-update-check          Skip the GitHub update check.
+echo   --jobs ^<n^>                 Number of files to process in parallel in batch mode.
+echo   --one-pass                 Faster single-pass (dynamic) normalization.
+echo   --force                    Re-analyze files already normalized by a previous run.
+echo   --update-check             Check GitHub for a new version before processing.
+echo   --no-update-check          Skip the GitHub update check (default).
 echo   --update                   Check for updates and exit.
 echo   --help, -h, /?, ?          Show this help message.
 echo.